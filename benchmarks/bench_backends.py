@@ -0,0 +1,120 @@
+"""Parsing time of manifests, config files and dict arguments for each backend
+
+Usage: python benchmarks/bench_backends.py [n_functions] [n_params]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from func2argparse import (
+    set_backends,
+    get_backends,
+    func_to_manifest,
+    str_to_dict,
+    load_config_layers,
+    _merge_config_layers,
+)
+
+
+def _make_manifest(n_functions, n_params):
+    functions = []
+    for i in range(n_functions):
+        params = []
+        for j in range(n_params):
+            params.append(
+                {
+                    "mandatory": j == 0,
+                    "description": f"Parameter {j} of function {i}. " * 3,
+                    "type": ("int", "float", "str", "Path")[j % 4],
+                    "name": f"param_{j}",
+                    "tag": f"--param-{j}",
+                    "value": j * 1.5,
+                    "nargs": "+" if j % 5 == 0 else None,
+                    "nullable": False,
+                    "choices": ["a", "b", "c"] if j % 7 == 0 else None,
+                }
+            )
+        functions.append(
+            {
+                "function": f"tools.module{i}.tool{i}",
+                "name": f"tool{i}",
+                "description": f"Tool number {i}",
+                "params": params,
+            }
+        )
+    return {"name": "tools", "version": "1", "functions": functions}
+
+
+def tool(x: int):
+    """Benchmark tool
+
+    Parameters
+    ----------
+    x : int
+        First arg
+    """
+    pass
+
+
+def _time(func, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        t = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def main(n_functions=500, n_params=20):
+    manifest = _make_manifest(n_functions, n_params)
+    manifest["functions"].append({"function": "bench.tool", "params": []})
+    config = {
+        f"param_{j}": {"values": list(range(100)), "name": f"value {j}"}
+        for j in range(n_functions)
+    }
+    dict_args = [json.dumps({"key": i, "values": [1, 2, 3]}) for i in range(10000)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        (tmpdir / "manifest.json").write_text(json.dumps(manifest))
+        (tmpdir / "conf.yaml").write_text(yaml.dump(config))
+        (tmpdir / "conf.json").write_text(json.dumps(config))
+        toolfile = str(tmpdir / "tool.py")
+
+        def load_conf(name):
+            _merge_config_layers.cache_clear()
+            load_config_layers([tmpdir / name])
+
+        columns = ("manifest", "conf.json", "conf.yaml", "dict args")
+        print(
+            f"{'json':>8} {'yaml':>8} "
+            + " ".join(f"{col:>10}" for col in columns)
+            + "  (ms)"
+        )
+        for json_backend in ("json", "ujson", "orjson"):
+            for yaml_backend in ("python", "libyaml"):
+                try:
+                    set_backends(json=json_backend, yaml=yaml_backend)
+                    get_backends()
+                except RuntimeError:
+                    continue
+                times = [
+                    _time(lambda: func_to_manifest(tool, file=toolfile)),
+                    _time(lambda: load_conf("conf.json")),
+                    _time(lambda: load_conf("conf.yaml"), repeats=2),
+                    _time(lambda: [str_to_dict(arg) for arg in dict_args]),
+                ]
+                print(
+                    f"{json_backend:>8} {yaml_backend:>8} "
+                    + " ".join(f"{t:>10.1f}" for t in times)
+                )
+    set_backends()
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -0,0 +1,67 @@
+"""Throughput of concurrent parsing with a ParserPool for increasing thread counts
+
+Usage: python benchmarks/bench_parser_pool.py [n_parses]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from func2argparse import func_to_manifest, ParserPool
+
+
+def tool(
+    x: int,
+    y: Path,
+    z: int = 54,
+    w: list[str] = ("hey", "ho"),
+    k: str = "choice1",
+    ll: list[int] = None,
+    flg: bool = False,
+):
+    """Benchmark tool
+
+    Parameters
+    ----------
+    x : int
+        First arg
+    y : Path
+        Second arg
+    z : int
+        Third arg
+    w : list[str]
+        Fourth arg
+    k : str, choices=("choice1", "choice2")
+        Fifth arg
+    ll : list[int]
+        Sixth arg
+    flg : bool
+        Seventh arg
+    """
+    pass
+
+
+def main(n_parses=20000):
+    pool = ParserPool(func_to_manifest(tool), exit_on_error=False)
+    argvs = [
+        ["--x", str(i), "--y", f"{i}.txt", "--k", "choice2", "--ll", "1", "2", "--flg"]
+        for i in range(n_parses)
+    ]
+
+    print(f"{'threads':>8} {'parses/s':>12} {'speedup':>8}")
+    baseline = None
+    for n_threads in (1, 2, 4, 8, 16):
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            t = time.perf_counter()
+            for _ in executor.map(pool.parse_args, argvs):
+                pass
+            elapsed = time.perf_counter() - t
+        throughput = n_parses / elapsed
+        if baseline is None:
+            baseline = throughput
+        print(f"{n_threads:>8} {throughput:>12.0f} {throughput / baseline:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(*[int(x) for x in sys.argv[1:]])
@@ -1,59 +1,436 @@
 import argparse
+import functools
+import logging
 from collections import OrderedDict
+from collections.abc import Sequence
 from importlib.metadata import version, PackageNotFoundError
 from pathlib import Path
 
 SERIALIZABLE_TYPES = {str, int, float, bool, Path, dict, list, tuple}
 
+logger = logging.getLogger(__name__)
+
 try:
     __version__ = version("func2argparse")
 except PackageNotFoundError:
     pass
 
 
+_JSON_BACKENDS = ("json", "orjson", "ujson")
+_YAML_BACKENDS = ("libyaml", "python")
+_backends = {}
+
+
+def set_backends(json="auto", yaml="auto"):
+    """Select the parsers used for manifests, config files and dict arguments
+
+    By default JSON is parsed with the standard library json module and YAML with
+    the libyaml C loader if PyYAML was built with it, falling back to the pure
+    Python loader. Both YAML loaders give the same results.
+
+    The faster orjson and ujson parsers are only used when selected explicitly
+    since they don't accept all inputs of the json module and may return
+    different values. For example orjson rejects NaN and converts integers larger
+    than 64 bits to floats.
+
+    Parameters
+    ----------
+    json : str, choices=("auto", "json", "orjson", "ujson")
+        The JSON parser. "auto" is the json module
+    yaml : str, choices=("auto", "libyaml", "python")
+        The YAML loader
+    """
+    import importlib
+
+    if json not in ("auto",) + _JSON_BACKENDS:
+        raise RuntimeError(f"Unknown JSON backend {json}")
+    if yaml not in ("auto",) + _YAML_BACKENDS:
+        raise RuntimeError(f"Unknown YAML backend {yaml}")
+
+    if json == "auto":
+        json = "json"
+    try:
+        module = importlib.import_module(json)
+    except ImportError:
+        raise RuntimeError(f"JSON backend {json} is not installed")
+
+    if yaml != "auto":
+        try:
+            import yaml as pyyaml
+        except ImportError:
+            raise RuntimeError(f"YAML backend {yaml} requires PyYAML to be installed")
+
+        if yaml == "libyaml" and not pyyaml.__with_libyaml__:
+            raise RuntimeError("PyYAML was not built with libyaml support")
+
+    _backends["json"] = (json, module.loads)
+    # The loader class is looked up lazily since yaml is only needed for YAML files
+    _backends["yaml"] = yaml
+
+
+def get_backends():
+    """Return the names of the JSON and YAML parsers in use
+
+    The YAML parser is None if PyYAML is not installed.
+    """
+    try:
+        yaml = _get_yaml_loader()[0]
+    except ImportError:
+        yaml = None
+    return {"json": _get_json_loads()[0], "yaml": yaml}
+
+
+def _get_json_loads():
+    if "json" not in _backends:
+        set_backends(yaml=_backends.get("yaml", "auto"))
+    return _backends["json"]
+
+
+def _get_yaml_loader():
+    import yaml
+
+    backend = _backends.get("yaml", "auto")
+    if backend in ("auto", "libyaml") and yaml.__with_libyaml__:
+        return "libyaml", yaml.CFullLoader
+    return "python", yaml.FullLoader
+
+
+def _json_loads(value):
+    return _get_json_loads()[1](value)
+
+
+def _yaml_load(stream):
+    import yaml
+
+    return yaml.load(stream, Loader=_get_yaml_loader()[1])
+
+
+def _read_config(path):
+    path = str(path)
+    if path.endswith("yaml") or path.endswith("yml"):
+        with open(path, "r") as f:
+            config = _yaml_load(f)
+    elif path.endswith("json"):
+        with open(path, "rb") as f:
+            config = _json_loads(f.read())
+
+        if "execid" in config and "params" in config:
+            # Special case for PlayMolecule
+            config = {prm["name"]: prm["value"] for prm in config["params"]}
+    else:
+        raise ValueError("Configuration file must end with yaml or yml")
+
+    if config is None:
+        config = {}
+    return config
+
+
+def _deep_merge(base, override):
+    merged = dict(base)
+    for key, val in override.items():
+        if isinstance(val, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], val)
+        else:
+            merged[key] = val
+    return merged
+
+
+@functools.lru_cache(maxsize=128)
+def _merge_config_layers(layers, parallel):
+    import os
+
+    # layers is a tuple of (path, mtime_ns, size) so that modified files miss the cache
+    paths = [layer[0] for layer in layers]
+    if parallel and len(paths) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(len(paths), 8)) as executor:
+            configs = list(executor.map(_read_config, paths))
+    else:
+        configs = [_read_config(path) for path in paths]
+
+    merged = {}
+    sources = {}  # Directory of the layer which last set each top-level key
+    for path, config in zip(paths, configs):
+        merged = _deep_merge(merged, config)
+        for key in config:
+            sources[key] = os.path.dirname(path)
+    return merged, sources
+
+
+def _load_config_layers(files, parallel):
+    import copy
+    import os
+
+    layers = []
+    for ff in files:
+        st = os.stat(ff)
+        layers.append((os.path.abspath(ff), st.st_mtime_ns, st.st_size))
+    merged, sources = _merge_config_layers(tuple(layers), parallel)
+    # Copy to protect the cached result from modifications by the caller
+    return copy.deepcopy(merged), dict(sources)
+
+
+def load_config_layers(files, parallel=False):
+    """Load and merge a list of configuration files
+
+    Later files take precedence over earlier ones. Dictionary values are merged
+    recursively instead of being replaced. The merged result is cached on the
+    path, modification time and size of each layer so that repeated loads of the
+    same layers only pay the parsing cost once.
+
+    Parameters
+    ----------
+    files : list
+        List of YAML or JSON configuration files, from lowest to highest precedence
+    parallel : bool
+        Read the layers concurrently using a thread pool
+
+    Returns
+    -------
+    config : dict
+        The merged configuration
+    """
+    return _load_config_layers(files, parallel)[0]
+
+
 class LoadFromFile(argparse.Action):
-    def __init__(self, unmatched_args="error", *args, **kwargs):
+    def __init__(self, unmatched_args="error", parallel=False, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if unmatched_args not in ("error", "warning"):
             raise RuntimeError("unmatched_args can only be set to error or warning")
         self.unmatched_args = unmatched_args
+        self.parallel = parallel
 
-    def _error_unfound(self, key, namespace):
-        if key not in namespace:
+    def _error_unfound(self, key, namespace, dests):
+        # Fields of structured parameters (e.g. opt.lr) are only in the namespace
+        # when given on the command line, so also accept any parser destination
+        if key not in namespace and key not in dests:
             if self.unmatched_args == "error":
                 raise ValueError(f"Unknown argument in config file: {key}")
             elif self.unmatched_args == "warning":
-                print(f"WARNING: Unknown argument in config file: {key}")
+                logger.warning(f"Unknown argument in config file: {key}")
+
+    def _load_array(self, parser, key, value, confdir):
+        import os
+
+        for action in parser._actions:
+            if action.dest == key and isinstance(action, _StoreArrayAction):
+                # Relative file references are relative to the config file
+                path = os.path.join(confdir, value[1:])
+                try:
+                    return action.type(f"@{path}")
+                except argparse.ArgumentTypeError as e:
+                    raise ValueError(f"Invalid value for {key} in config file: {e}")
+        return value
 
     # parser.add_argument('--file', type=open, action=LoadFromFile)
     def __call__(self, parser, namespace, values, option_string=None):
-        import yaml
-        import json
-
-        if values.name.endswith("yaml") or values.name.endswith("yml"):
-            with values as f:
-                config = yaml.load(f, Loader=yaml.FullLoader)
-            for key in config.keys():
-                self._error_unfound(key, namespace)
-            namespace.__dict__.update(config)
-        elif values.name.endswith("json"):
-            with values as f:
-                config = json.load(f)
-
-            if "execid" in config and "params" in config:
-                # Special case for PlayMolecule
-                config = config["params"]
-                for prm in config:
-                    key = prm["name"]
-                    self._error_unfound(key, namespace)
-                    namespace.__dict__[key] = prm["value"]
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+
+        files = []
+        for val in values:
+            if hasattr(val, "read"):  # Opened by argparse with type=open
+                val.close()
+                val = val.name
+            files.append(str(val))
+
+        # Layers from earlier --conf options come before the current ones
+        previous = getattr(namespace, self.dest, None) or []
+        layers = list(previous) + files
+        config, sources = _load_config_layers(layers, self.parallel)
+
+        # Destinations given so far on the command line. Later ones simply
+        # overwrite the config values when argparse reaches them.
+        explicit = set()
+        if isinstance(parser, _ArgumentParser):
+            explicit = parser._explicit_dests()
+
+        dests = {action.dest for action in parser._actions}
+        for key, val in config.items():
+            self._error_unfound(key, namespace, dests)
+            if key in explicit:
+                # Explicit command line values take precedence over config files
+                continue
+            if isinstance(val, str) and val.startswith("@"):
+                val = self._load_array(parser, key, val, sources[key])
+            setattr(namespace, key, val)
+        setattr(namespace, self.dest, layers)
+
+
+_NPY_FORMATS = {
+    "f8": "d",
+    "f4": "f",
+    "i8": "q",
+    "i4": "i",
+    "i2": "h",
+    "i1": "b",
+    "u8": "Q",
+    "u4": "I",
+    "u2": "H",
+    "u1": "B",
+}
+
+
+def _read_npy_header(f):
+    import struct
+    import sys
+    from ast import literal_eval
+
+    if f.read(6) != b"\x93NUMPY":
+        raise ValueError(f"{f.name} is not a valid .npy file")
+    major = f.read(2)[0]
+    if major == 1:
+        (headerlen,) = struct.unpack("<H", f.read(2))
+    else:
+        (headerlen,) = struct.unpack("<I", f.read(4))
+    header = literal_eval(f.read(headerlen).decode("latin1"))
+
+    descr = header["descr"]
+    native = "<" if sys.byteorder == "little" else ">"
+    if (
+        not isinstance(descr, str)
+        or descr[0] not in (native, "|", "=")
+        or descr[1:] not in _NPY_FORMATS
+    ):
+        raise ValueError(f"Unsupported data type {descr} in {f.name}")
+    if len(header["shape"]) != 1:
+        raise ValueError(
+            f"Only one-dimensional arrays are supported. {f.name} has shape {header['shape']}"
+        )
+    return _NPY_FORMATS[descr[1:]], header["shape"][0], f.tell()
+
+
+class ArrayParam(Sequence):
+    """Read-only sequence of numbers memory-mapped from a binary file
+
+    Supports one-dimensional .npy files and raw binary files in native byte order
+    (float64 for float parameters and int64 for int parameters). The data type is
+    validated when the file is opened but the values are only read from disk when
+    they are accessed. The memory map is kept open until `close` is called or the
+    object is used as a context manager.
+
+    Parameters
+    ----------
+    path : str
+        The .npy or raw binary file
+    scalar_type : type
+        The type of the parameter, int or float
+    """
+
+    def __init__(self, path, scalar_type):
+        import mmap
+        import os
+        import struct
+
+        if scalar_type not in (int, float):
+            raise ValueError("Only int and float arrays can be loaded from files")
+        self.path = str(path)
+        self.scalar_type = scalar_type
+
+        with open(self.path, "rb") as f:
+            if self.path.endswith(".npy"):
+                fmt, length, offset = _read_npy_header(f)
+                if (fmt in "fd") != (scalar_type is float):
+                    raise ValueError(
+                        f"Data type of {self.path} does not match parameter type {scalar_type.__name__}"
+                    )
             else:
-                # General use case similar to yaml above
-                for key in config.keys():
-                    self._error_unfound(key, namespace)
-                namespace.__dict__.update(config)
-        else:
-            raise ValueError("Configuration file must end with yaml or yml")
+                fmt = "d" if scalar_type is float else "q"
+                offset = 0
+                size = os.fstat(f.fileno()).st_size
+                if size % 8 != 0:
+                    raise ValueError(
+                        f"Size of {self.path} is not a multiple of the 8 byte item size"
+                    )
+                length = size // 8
+
+            nbytes = length * struct.calcsize(fmt)
+            if nbytes == 0:
+                self._mmap = None
+                self._view = memoryview(b"").cast(fmt)
+            else:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if offset + nbytes > len(self._mmap):
+                    raise ValueError(f"{self.path} is truncated")
+                self._view = memoryview(self._mmap)[offset : offset + nbytes].cast(fmt)
+
+    def __len__(self):
+        return len(self._view)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self._view[idx].tolist()
+        return self._view[idx]
+
+    def __iter__(self):
+        return iter(self._view)
+
+    def __eq__(self, other):
+        if isinstance(other, ArrayParam):
+            return self._view == other._view
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return (
+            f"ArrayParam({self.path!r}, {self.scalar_type.__name__}, len={len(self)})"
+        )
+
+    def __reduce__(self):
+        # Memory maps can't be pickled, map the file again when unpickling
+        return (ArrayParam, (self.path, self.scalar_type))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Release the memory map and its file. The values can't be accessed anymore"""
+        # The view must be released before the memory map can be closed
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def tolist(self):
+        return self._view.tolist()
+
+    def digest(self):
+        """Return a SHA-256 hex digest of the data"""
+        import hashlib
+
+        with self._view.cast("B") as data:
+            return hashlib.sha256(data).hexdigest()
+
+
+def _array_or_scalar(scalar_type):
+    # Converts "@file" references to memory-mapped arrays and everything else to scalars
+    def convert(value):
+        if isinstance(value, str) and value.startswith("@"):
+            try:
+                return ArrayParam(value[1:], scalar_type)
+            except (OSError, ValueError) as e:
+                raise argparse.ArgumentTypeError(str(e))
+        return scalar_type(value)
+
+    convert.__name__ = scalar_type.__name__
+    return convert
+
+
+class _StoreArrayAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        if any(isinstance(val, ArrayParam) for val in values):
+            if len(values) != 1:
+                raise argparse.ArgumentError(
+                    self, "A file reference must be the only value of the argument"
+                )
+            values = values[0]
+        setattr(namespace, self.dest, values)
 
 
 def _parse_docs(doc):
@@ -148,81 +525,254 @@ def is_union_type(tp) -> bool:
     return get_origin(tp) is Union
 
 
-def _parse_function(func):
-    from typing import get_origin, get_args
-    import inspect
-
-    # Get function signature and documentation
-    sig = inspect.signature(func)
-    doc = func.__doc__
-    if doc is None:
-        raise RuntimeError("Could not find documentation in the function...")
-
-    argdocs, description, name = _parse_docs(doc)
-
+def _get_signature_args(sig):
     # Don't add underscore arguments to argparser or args, kwargs
     sigargs = []
     for argn in sig.parameters:
         if not (argn.startswith("_") or argn in ("args", "kwargs")):
             sigargs.append(argn)
+    return sigargs
+
 
+def _check_argument_docs(sigargs, argdocs):
+    errors = []
     for argn in sigargs:
         if argn not in argdocs:
-            raise RuntimeError(
+            errors.append(
                 f"Could not find help for argument {argn} in the docstring of the function. Please document it."
             )
 
     for argn in argdocs:
         if argn not in sigargs:
-            raise RuntimeError(
+            errors.append(
                 f"Found docs for argument {argn} in the docstring which is not in the function signature. Please remove it."
             )
 
+    if len(errors):
+        return errors  # Order comparison is meaningless with missing arguments
+
     for argn1, argn2 in zip(sigargs, argdocs):
         if argn1 != argn2:
-            raise RuntimeError(
+            errors.append(
                 f"Argument order mismatch between function signature and documentation (need to have same order). {argn1} != {argn2}"
             )
+            break
+    return errors
 
-    arguments = []
-    for argname in sigargs:
-        params = sig.parameters[argname]
 
-        argtype = params.annotation
-        nullable = False
-
-        if is_union_type(argtype):
-            union_args = get_args(argtype)
-            nullable = type(None) in union_args
-            filtered = []
-            for t in union_args:
-                if t is type(None):
-                    continue
-                origin = get_origin(t)
-                if origin is not None:
-                    if origin in SERIALIZABLE_TYPES:
-                        filtered.append(t)
-                elif t in SERIALIZABLE_TYPES:
+def _resolve_annotation(argname, argtype):
+    from typing import get_origin, get_args
+
+    nullable = False
+
+    if is_union_type(argtype):
+        union_args = get_args(argtype)
+        nullable = type(None) in union_args
+        filtered = []
+        for t in union_args:
+            if t is type(None):
+                continue
+            origin = get_origin(t)
+            if origin is not None:
+                if origin in SERIALIZABLE_TYPES:
                     filtered.append(t)
-            if filtered:
-                argtype = filtered[0]
+            elif t in SERIALIZABLE_TYPES or _is_struct_type(t):
+                filtered.append(t)
+        if filtered:
+            argtype = filtered[0]
+        else:
+            import warnings
+
+            warnings.warn(
+                f"No serializable types found in union for argument '{argname}', defaulting to str"
+            )
+            argtype = str
+
+    nargs = None
+    # This is needed for compound types like: list[str]
+    if get_origin(argtype) is not None:
+        origtype = get_origin(argtype)
+        argtype = get_args(argtype)[0]
+        if origtype in (list, tuple):
+            nargs = "+"
+        elif origtype == dict:
+            argtype = dict
+
+    return argtype, nargs, nullable
+
+
+# Classes of structured parameters by "module:qualname" to rebuild them after parsing
+_STRUCT_TYPES = {}
+
+
+def _is_struct_type(tp):
+    import dataclasses
+
+    if not isinstance(tp, type):
+        return False
+    if dataclasses.is_dataclass(tp):
+        return True
+    if issubclass(tp, tuple) and hasattr(tp, "_fields"):  # NamedTuple
+        return True
+    return issubclass(tp, dict) and hasattr(tp, "__required_keys__")  # TypedDict
+
+
+def _struct_id(cls):
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _resolve_struct(struct_id):
+    import importlib
+
+    if struct_id in _STRUCT_TYPES:
+        return _STRUCT_TYPES[struct_id]
+    module, qualname = struct_id.split(":")
+    try:
+        obj = importlib.import_module(module)
+        for attr in qualname.split("."):
+            obj = getattr(obj, attr)
+    except (ImportError, AttributeError):
+        return None
+    return obj
+
+
+@functools.lru_cache(maxsize=None)
+def _struct_fields(cls):
+    # Field schema of a dataclass, NamedTuple or TypedDict with names relative to
+    # the class. Cached since it is shared by all functions using the class.
+    import dataclasses
+    import typing
+
+    _STRUCT_TYPES[_struct_id(cls)] = cls
+    hints = typing.get_type_hints(cls)
+
+    spec = []  # (name, has_default, default)
+    if dataclasses.is_dataclass(cls):
+        for ff in dataclasses.fields(cls):
+            if ff.default is not dataclasses.MISSING:
+                spec.append((ff.name, True, ff.default))
+            elif ff.default_factory is not dataclasses.MISSING:
+                spec.append((ff.name, True, ff.default_factory()))
             else:
-                import warnings
+                spec.append((ff.name, False, None))
+    elif issubclass(cls, tuple):
+        defaults = cls._field_defaults
+        spec = [(name, name in defaults, defaults.get(name)) for name in cls._fields]
+    else:
+        spec = [(name, name not in cls.__required_keys__, None) for name in hints]
+
+    fields = []
+    for name, has_default, default in spec:
+        argtype, nargs, nullable = _resolve_annotation(name, hints[name])
+        field = OrderedDict()
+        field["mandatory"] = not has_default
+        field["description"] = f"Field {name} of {cls.__name__}"
+        field["type"] = argtype.__name__
+        field["name"] = name
+        field["tag"] = f"--{name.replace('_', '-')}"
+        field["value"] = default
+        field["nargs"] = nargs
+        field["nullable"] = nullable or (has_default and default is None)
+        field["choices"] = None
+        if _is_struct_type(argtype):
+            field["struct"] = _struct_id(argtype)
+            field["fields"] = _struct_fields(argtype)
+            field["value"] = _struct_to_dict(argtype, default)
+        fields.append(field)
+    return tuple(fields)
+
+
+def _struct_to_dict(cls, value):
+    if value is None:
+        return None
+    result = {}
+    for field in _struct_fields(cls):
+        name = field["name"]
+        if isinstance(value, dict):
+            if name not in value:
+                continue
+            val = value[name]
+        else:
+            val = getattr(value, name)
+        if "struct" in field and val is not None:
+            subcls = _resolve_struct(field["struct"])
+            if subcls is not None:
+                val = _struct_to_dict(subcls, val)
+        result[name] = val
+    return result
 
-                warnings.warn(
-                    f"No serializable types found in union for argument '{argname}', defaulting to str"
-                )
-                argtype = str
-
-        nargs = None
-        # This is needed for compound types like: list[str]
-        if get_origin(argtype) is not None:
-            origtype = get_origin(argtype)
-            argtype = get_args(argtype)[0]
-            if origtype in (list, tuple):
-                nargs = "+"
-            elif origtype == dict:
-                argtype = dict
+
+def _build_struct(cls, values, name):
+    kwargs = {}
+    fields = _struct_fields(cls)
+    for key in values:
+        if key not in [field["name"] for field in fields]:
+            raise ValueError(f"Unknown field {name}.{key}")
+    for field in fields:
+        fname = field["name"]
+        if fname in values:
+            val = values[fname]
+        elif not field["mandatory"]:
+            continue  # Let the class fill in the default
+        elif "struct" in field:
+            val = {}  # Build from the defaults of the nested class
+        else:
+            raise ValueError(f"Missing value for {name}.{fname}")
+        if "struct" in field:
+            subcls = _resolve_struct(field["struct"])
+            if subcls is not None and isinstance(val, dict):
+                val = _build_struct(subcls, val, f"{name}.{fname}")
+        elif val is not None or not field["nullable"]:
+            # Values from config files are not converted by argparse, check them
+            # here the same way as the command line values
+            val = _convert_param_value({**field, "name": f"{name}.{fname}"}, val)
+        kwargs[fname] = val
+    return cls(**kwargs)
+
+
+def _prefix_struct_fields(fields, prefix, values, mandatory):
+    import copy
+
+    result = []
+    for field in fields:
+        field = copy.deepcopy(OrderedDict(field))
+        name = field["name"]
+        field["name"] = f"{prefix}.{name}"
+        field["tag"] = f"--{field['name'].replace('_', '-')}"
+        if values is not None and name in values:
+            field["value"] = copy.deepcopy(values[name])
+            field["mandatory"] = False
+        else:
+            field["mandatory"] = field["mandatory"] and mandatory
+        if "fields" in field:
+            field["fields"] = _prefix_struct_fields(
+                field["fields"], field["name"], field["value"], field["mandatory"]
+            )
+        result.append(field)
+    return result
+
+
+def _parse_function(func):
+    import inspect
+
+    # Get function signature and documentation
+    sig = inspect.signature(func)
+    doc = func.__doc__
+    if doc is None:
+        raise RuntimeError("Could not find documentation in the function...")
+
+    argdocs, description, name = _parse_docs(doc)
+
+    sigargs = _get_signature_args(sig)
+    errors = _check_argument_docs(sigargs, argdocs)
+    if len(errors):
+        raise RuntimeError(errors[0])
+
+    arguments = []
+    for argname in sigargs:
+        params = sig.parameters[argname]
+
+        argtype, nargs, nullable = _resolve_annotation(argname, params.annotation)
 
         # Override the nargs if specified in the docstring
         if "nargs" in argdocs[argname]:
@@ -257,12 +807,21 @@ def _parse_function(func):
         argument["choices"] = argdocs[argname]["choices"]
         if "gui_options" in argdocs[argname]:
             argument["gui_options"] = argdocs[argname]["gui_options"]
+        if _is_struct_type(argtype):
+            # Structured parameters are expanded to one dotted flag per field
+            argument["value"] = _struct_to_dict(argtype, default)
+            argument["struct"] = _struct_id(argtype)
+            argument["fields"] = _prefix_struct_fields(
+                _struct_fields(argtype),
+                argname,
+                argument["value"],
+                argument["mandatory"],
+            )
         arguments.append(argument)
     return name, description, arguments
 
 
 def func_to_manifest(functions, file=None, pm_mode=True):
-    import json
     import os
 
     if not isinstance(functions, list):
@@ -274,14 +833,12 @@ def func_to_manifest(functions, file=None, pm_mode=True):
     if file is not None:
         manifestf = os.path.join(os.path.dirname(file), "manifest.json")
         if os.path.exists(manifestf):
-            with open(manifestf, "r") as f:
-                manifest = json.load(f)
+            with open(manifestf, "rb") as f:
+                manifest = _json_loads(f.read())
         manifestf = os.path.join(os.path.dirname(file), "manifest.yaml")
         if os.path.exists(manifestf):
-            import yaml
-
             with open(manifestf, "r") as f:
-                manifest = yaml.load(f, Loader=yaml.FullLoader)
+                manifest = _yaml_load(f)
 
     for func in functions:
         name, description, arguments = _parse_function(func)
@@ -315,15 +872,274 @@ def func_to_manifest(functions, file=None, pm_mode=True):
     return manifest
 
 
-def _add_params_to_parser(parser, params, allow_conf_yaml, unmatched_args):
+def validate_functions(functions):
+    """Check the signatures and docstrings of functions, collecting all errors
+
+    Unlike `func_to_manifest`, which stops at the first error, this reports all
+    documentation problems of all functions in a single pass.
+
+    Parameters
+    ----------
+    functions : list
+        The functions to check
+
+    Returns
+    -------
+    errors : dict
+        Maps the full name of each function with problems to its list of errors
+    """
+    import inspect
+
+    if not isinstance(functions, list):
+        functions = [functions]
+
+    errors = OrderedDict()
+    for func in functions:
+        func_errors = []
+        try:
+            if func.__doc__ is None:
+                func_errors.append("Could not find documentation in the function...")
+            else:
+                argdocs = _parse_docs(func.__doc__)[0]
+                sigargs = _get_signature_args(inspect.signature(func))
+                func_errors += _check_argument_docs(sigargs, argdocs)
+
+            if not len(func_errors):
+                # Catch the remaining errors like bad defaults or missing annotations
+                _parse_function(func)
+        except RuntimeError as e:
+            func_errors.append(str(e))
+        except Exception as e:
+            # Any failure only concerns this function, keep checking the others
+            func_errors.append(f"{type(e).__name__}: {e}")
+
+        if len(func_errors):
+            name = getattr(func, "__qualname__", repr(func))
+            errors[f"{getattr(func, '__module__', None)}.{name}"] = func_errors
+    return errors
+
+
+def _manifest_functions(manifest):
+    if "functions" in manifest:
+        return OrderedDict(
+            (ff.get("name", ff.get("function")), ff) for ff in manifest["functions"]
+        )
+    return OrderedDict([(manifest["name"], manifest)])
+
+
+def _hash_manifest_entry(entry):
+    import hashlib
+    import json
+
+    return hashlib.sha256(
+        json.dumps(entry, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _breaking_param_changes(old_params, new_params):
+    changes = []
+    new_params = {prm["name"]: prm for prm in new_params}
+    old_names = set()
+    for old in old_params:
+        name = old["name"]
+        old_names.add(name)
+        if name not in new_params:
+            changes.append(f"Removed parameter {name}")
+            continue
+        new = new_params[name]
+        for field in ("type", "nargs"):
+            if old.get(field) != new.get(field):
+                changes.append(
+                    f"Changed {field} of parameter {name} from {old.get(field)} to {new.get(field)}"
+                )
+        if new.get("mandatory") and not old.get("mandatory"):
+            changes.append(f"Parameter {name} became mandatory")
+        if new.get("choices") is not None:
+            if old.get("choices") is None:
+                changes.append(f"Restricted parameter {name} to choices")
+            else:
+                removed = [c for c in old["choices"] if c not in new["choices"]]
+                if len(removed):
+                    changes.append(f"Removed choices {removed} of parameter {name}")
+        if "fields" in old and "fields" in new:
+            changes += _breaking_param_changes(old["fields"], new["fields"])
+
+    for name, new in new_params.items():
+        if name not in old_names and new.get("mandatory"):
+            changes.append(f"Added mandatory parameter {name}")
+    return changes
+
+
+def diff_manifests(old, new):
+    """Compare two manifests and report the changes between them
+
+    Function entries are compared by hash so that unchanged functions are skipped
+    cheaply. Breaking changes are those which can make existing calls fail:
+    removed functions or parameters, new mandatory parameters and changed types,
+    nargs or choices.
+
+    Parameters
+    ----------
+    old : dict
+        The reference manifest, e.g. the one committed in the repository
+    new : dict
+        The new manifest, e.g. the one generated with `func_to_manifest`
+
+    Returns
+    -------
+    diff : dict
+        Dictionary with the lists of "added", "removed" and "changed" function names
+        and the list of "breaking" change descriptions
+    """
+    old_funcs = _manifest_functions(old)
+    new_funcs = _manifest_functions(new)
+
+    diff = {"added": [], "removed": [], "changed": [], "breaking": []}
+    for name, old_entry in old_funcs.items():
+        if name not in new_funcs:
+            diff["removed"].append(name)
+            diff["breaking"].append(f"{name}: Removed function")
+            continue
+        new_entry = new_funcs[name]
+        if _hash_manifest_entry(old_entry) == _hash_manifest_entry(new_entry):
+            continue
+        diff["changed"].append(name)
+        for change in _breaking_param_changes(
+            old_entry.get("params", []), new_entry.get("params", [])
+        ):
+            diff["breaking"].append(f"{name}: {change}")
+
+    for name in new_funcs:
+        if name not in old_funcs:
+            diff["added"].append(name)
+    return diff
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    # Records the destinations given on the command line, so that config files
+    # don't override them, and builds the values of structured parameters from
+    # their dotted flags after parsing
+
+    def __init__(self, *args, **kwargs):
+        import threading
+
+        super().__init__(*args, **kwargs)
+        self._struct_params = []
+        # Per-thread so that concurrent parses don't see each other's arguments
+        self._parse_state = threading.local()
+
+    def _explicit_dests(self):
+        return getattr(self._parse_state, "explicit", None) or set()
+
+    def _get_values(self, action, arg_strings):
+        # Only called for actions which appear on the command line
+        explicit = getattr(self._parse_state, "explicit", None)
+        if explicit is not None:
+            explicit.add(action.dest)
+        return super()._get_values(action, arg_strings)
+
+    def parse_known_args(self, args=None, namespace=None):
+        previous = getattr(self._parse_state, "explicit", None)
+        self._parse_state.explicit = set()
+        try:
+            namespace, extras = super().parse_known_args(args, namespace)
+        finally:
+            self._parse_state.explicit = previous
+        for param in self._struct_params:
+            try:
+                _finalize_struct_param(namespace, param)
+            except (ValueError, TypeError, argparse.ArgumentTypeError) as e:
+                if getattr(self, "exit_on_error", True):
+                    self.error(str(e))
+                raise argparse.ArgumentError(None, str(e))
+        return namespace, extras
+
+
+def _unflatten(values):
+    result = {}
+    for key, val in values.items():
+        pieces = key.split(".")
+        curr = result
+        for piece in pieces[:-1]:
+            curr = curr.setdefault(piece, {})
+        curr[pieces[-1]] = val
+    return result
+
+
+def _finalize_struct_param(namespace, param):
+    name = param["name"]
+    prefix = f"{name}."
+    given = {}
+    for key in [key for key in vars(namespace) if key.startswith(prefix)]:
+        given[key[len(prefix) :]] = namespace.__dict__.pop(key)
+
+    value = getattr(namespace, name, None)
+    if not len(given) and not isinstance(value, dict):
+        if value is not None or not param["mandatory"]:
+            return  # Default value or already built
+
+    cls = _resolve_struct(param["struct"])
+    if isinstance(value, dict):
+        # Partial values from config files are merged over the parameter default
+        base = _deep_merge(param["value"] or {}, value)
+    elif value is None or cls is None:
+        base = {}
+    else:
+        base = _struct_to_dict(cls, value)
+    values = _deep_merge(base, _unflatten(given))
+
+    if cls is None:
+        # The class is not importable, fall back to a plain dictionary
+        setattr(namespace, name, values)
+        return
+    setattr(namespace, name, _build_struct(cls, values, name))
+
+
+def _add_struct_fields_to_parser(parser, fields, type_map):
+    for field in fields:
+        if "fields" in field:
+            _add_struct_fields_to_parser(parser, field["fields"], type_map)
+            continue
+
+        help = field["description"]
+        if field["mandatory"]:
+            help += " (required)"
+        else:
+            help += f" (default: {field['value']})"
+        # Absent fields are not added to the namespace so that they keep the value
+        # of the parameter default or config file. Mandatory fields are checked when
+        # building the value since they can also be set from config files.
+        kwargs = {
+            "dest": field["name"],
+            "help": help,
+            "default": argparse.SUPPRESS,
+        }
+        if field["type"] == "bool" and field["nargs"] is None:
+            kwargs["action"] = argparse.BooleanOptionalAction
+        else:
+            if field["type"] == "bool":
+                kwargs["type"] = str_to_bool
+            else:
+                kwargs["type"] = type_map.get(field["type"])
+            kwargs["nargs"] = field["nargs"]
+            kwargs["choices"] = field["choices"]
+        parser.add_argument(field["tag"], **kwargs)
+
+
+def _add_params_to_parser(
+    parser, params, allow_conf_yaml, unmatched_args, parallel_conf=False
+):
     from pathlib import Path
 
     if allow_conf_yaml:
         parser.add_argument(
             "--conf",
-            help="Configuration YAML file to set all parameters",
+            help="Configuration YAML files to set all parameters. Multiple files are merged in order, with later files taking precedence. Explicit command line arguments override the config files",
             type=open,
-            action=lambda *x, **y: LoadFromFile(*x, **y, unmatched_args=unmatched_args),
+            nargs="+",
+            action=functools.partial(
+                LoadFromFile, unmatched_args=unmatched_args, parallel=parallel_conf
+            ),
         )
 
     # Calculate abbreviations
@@ -339,7 +1155,11 @@ def _add_params_to_parser(parser, params, allow_conf_yaml, unmatched_args):
     }
     for param in params:
         argname = param["name"]
-        if param["type"] == "bool":
+        if "fields" in param:
+            parser.set_defaults(**{argname: param["value"]})
+            _add_struct_fields_to_parser(parser, param["fields"], type_map)
+            parser._struct_params.append(param)
+        elif param["type"] == "bool":
             if param["nargs"] is None:
                 if param["value"] is True:
                     parser.add_argument(
@@ -369,17 +1189,28 @@ def _add_params_to_parser(parser, params, allow_conf_yaml, unmatched_args):
             if param["type"] in type_map:
                 param_type = type_map[param["type"]]
             else:
-                print(
-                    f"Warning: Argument {argname} of type {param['type']} could not be mapped to a Python base type and thus will not be type-checked."
+                logger.warning(
+                    f"Argument {argname} of type {param['type']} could not be mapped to a Python base type and thus will not be type-checked."
                 )
                 param_type = None
 
+            action = "store"
+            if (
+                param_type in (int, float)
+                and param["nargs"] == "+"
+                and param["choices"] is None
+            ):
+                # Large arrays can be passed as memory-mapped @file references
+                param_type = _array_or_scalar(param_type)
+                action = _StoreArrayAction
+
             parser.add_argument(
                 f"--{argname.replace('_', '-')}",
                 f"-{abbrevs[argname]}",
                 help=param["description"],
                 default=param["value"],
                 type=param_type,
+                action=action,
                 choices=param["choices"],
                 required=param["mandatory"],
                 nargs=param["nargs"],
@@ -387,7 +1218,11 @@ def _add_params_to_parser(parser, params, allow_conf_yaml, unmatched_args):
 
 
 def manifest_to_argparser(
-    manifest, exit_on_error=True, allow_conf_yaml=False, unmatched_args="error"
+    manifest,
+    exit_on_error=True,
+    allow_conf_yaml=False,
+    unmatched_args="error",
+    parallel_conf=False,
 ):
     # If it's a single function treat it like the old code
     if "functions" in manifest and len(manifest["functions"]) == 1:
@@ -395,12 +1230,12 @@ def manifest_to_argparser(
 
     if "functions" in manifest:
         try:
-            parser = argparse.ArgumentParser(
+            parser = _ArgumentParser(
                 formatter_class=argparse.ArgumentDefaultsHelpFormatter,
                 exit_on_error=exit_on_error,
             )
         except Exception:
-            parser = argparse.ArgumentParser(
+            parser = _ArgumentParser(
                 formatter_class=argparse.ArgumentDefaultsHelpFormatter,
             )
 
@@ -411,28 +1246,85 @@ def manifest_to_argparser(
                 description=ff["description"],
                 formatter_class=argparse.ArgumentDefaultsHelpFormatter,
             )
-            _add_params_to_parser(subp, ff["params"], allow_conf_yaml, unmatched_args)
+            _add_params_to_parser(
+                subp, ff["params"], allow_conf_yaml, unmatched_args, parallel_conf
+            )
     else:
         try:
-            parser = argparse.ArgumentParser(
+            parser = _ArgumentParser(
                 manifest["name"],
                 description=manifest["description"],
                 formatter_class=argparse.ArgumentDefaultsHelpFormatter,
                 exit_on_error=exit_on_error,
             )
         except Exception:
-            parser = argparse.ArgumentParser(
+            parser = _ArgumentParser(
                 manifest["name"],
                 description=manifest["description"],
                 formatter_class=argparse.ArgumentDefaultsHelpFormatter,
             )
         _add_params_to_parser(
-            parser, manifest["params"], allow_conf_yaml, unmatched_args
+            parser, manifest["params"], allow_conf_yaml, unmatched_args, parallel_conf
         )
 
     return parser
 
 
+class ParserPool:
+    """Pool of argparsers built from a manifest for concurrent parsing
+
+    Parsing keeps all its state in the namespace of each call, but argparsers are
+    not documented as thread-safe. The pool hands each concurrent call its own
+    parser, building new ones on demand and reusing them afterwards, so a single
+    pool can be shared by many threads or asyncio tasks.
+
+    Parameters
+    ----------
+    manifest : dict
+        The manifest from which to build the parsers. It is copied so later
+        modifications do not affect the pool
+    **kwargs :
+        Arguments passed to `manifest_to_argparser`. Using exit_on_error=False is
+        recommended so that parsing errors raise instead of exiting
+
+    Examples
+    --------
+    >>> pool = ParserPool(func_to_manifest(foo), exit_on_error=False)
+    >>> args = pool.parse_args(["--x", "5", "--y", "file.txt"])
+    """
+
+    def __init__(self, manifest, **kwargs):
+        import copy
+        import queue
+
+        self._manifest = copy.deepcopy(manifest)
+        self._kwargs = kwargs
+        self._parsers = queue.SimpleQueue()
+        self._parsers.put(manifest_to_argparser(self._manifest, **self._kwargs))
+
+    def _acquire(self):
+        import queue
+
+        try:
+            return self._parsers.get_nowait()
+        except queue.Empty:
+            return manifest_to_argparser(self._manifest, **self._kwargs)
+
+    def parse_args(self, args=None, namespace=None):
+        parser = self._acquire()
+        try:
+            return parser.parse_args(args, namespace)
+        finally:
+            self._parsers.put(parser)
+
+    def parse_known_args(self, args=None, namespace=None):
+        parser = self._acquire()
+        try:
+            return parser.parse_known_args(args, namespace)
+        finally:
+            self._parsers.put(parser)
+
+
 def str_to_bool(value):
     if isinstance(value, bool):
         return value
@@ -446,11 +1338,10 @@ def str_to_bool(value):
 def str_to_dict(value):
     if isinstance(value, dict):
         return value
-    import json
 
     try:
-        result = json.loads(value)
-    except json.JSONDecodeError:
+        result = _json_loads(value)
+    except ValueError:
         raise argparse.ArgumentTypeError(
             f"Invalid dict value: {value!r}. Must be a valid JSON object."
         )
@@ -459,3 +1350,418 @@ def str_to_dict(value):
             f"Expected a JSON object, got {type(result).__name__}"
         )
     return result
+
+
+def _convert_param_value(param, value):
+    converters = {
+        "Path": Path,
+        "bool": str_to_bool,
+        "int": int,
+        "float": float,
+        "str": str,
+        "dict": str_to_dict,
+    }
+    expected = {"bool": bool, "int": int, "float": float, "str": str, "dict": dict}
+    typename = param["type"]
+    name = param["name"]
+
+    def convert(val):
+        if typename not in converters:
+            return val  # Not type-checked, same as in the argparser
+        if isinstance(val, str) or typename == "Path":
+            return converters[typename](val)
+        if typename == "float" and type(val) is int:
+            return float(val)
+        if not isinstance(val, expected[typename]) or (
+            typename == "int" and isinstance(val, bool)
+        ):
+            raise ValueError(
+                f"Invalid value {val!r} for parameter {name} of type {typename}"
+            )
+        return val
+
+    def check_choice(val):
+        if param["choices"] is not None and val not in param["choices"]:
+            raise ValueError(
+                f"Invalid value {val!r} for parameter {name}. Choices are {param['choices']}"
+            )
+        return val
+
+    nargs = param["nargs"]
+    if nargs is None:
+        return check_choice(convert(value))
+
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(
+            f"Parameter {name} takes multiple values (nargs={nargs}). Got {value!r}"
+        )
+    if isinstance(nargs, int) and len(value) != nargs:
+        raise ValueError(
+            f"Parameter {name} takes exactly {nargs} values. Got {len(value)}"
+        )
+    return [check_choice(convert(val)) for val in value]
+
+
+def iter_sweep(params, ranges, sweep_choices=False, shard=0, num_shards=1):
+    """Lazily generate the parameter sets of a grid sweep
+
+    The sweep is the cartesian product of the values given in `ranges`. Values are
+    converted and validated against the manifest parameters (type, nargs and
+    choices) once per axis and duplicate values on each axis are removed by hashing,
+    so every combination is unique. Combinations are generated on the fly and never
+    materialized, so memory use does not depend on the size of the grid.
+
+    Parameters
+    ----------
+    params : list
+        The list of parameters of a manifest, e.g. manifest["params"]
+    ranges : dict
+        Maps parameter names to an iterable of the values to sweep over. Strings are
+        converted like on the command line. Parameters with multiple values take
+        lists or tuples
+    sweep_choices : bool
+        Also sweep over all choices of parameters which have choices and over both
+        values of boolean flags, unless they are given in `ranges`
+    shard : int
+        Index of the shard to generate, between 0 and num_shards - 1
+    num_shards : int
+        Number of shards to split the sweep in. Shards are interleaved by index so
+        all of them are of similar size
+
+    Returns
+    -------
+    combinations : generator
+        Dictionaries with a value for every parameter. Parameters which are not
+        swept take their default value. The values are shared between combinations
+        and should not be modified in place.
+
+    Examples
+    --------
+    >>> manifest = func_to_manifest(foo)
+    >>> for prms in iter_sweep(manifest["params"], {"x": range(3), "k": ["choice1", "choice2"]}):
+    ...     foo(**prms)
+    """
+    import itertools
+    import hashlib
+    import json
+
+    if not (0 <= shard < num_shards):
+        raise ValueError(f"Invalid shard index {shard} for {num_shards} shards")
+
+    names = [param["name"] for param in params]
+    for name in ranges:
+        if name not in names:
+            raise RuntimeError(f"Sweep range given for unknown parameter {name}")
+
+    fixed = {}
+    axes = OrderedDict()
+    for param in params:
+        name = param["name"]
+        if name in ranges:
+            values = ranges[name]
+            if isinstance(values, (str, bytes, dict)):
+                raise ValueError(
+                    f"Sweep range of parameter {name} must be a list of values. Got {values!r}"
+                )
+        elif sweep_choices and param["nargs"] is None and param["choices"] is not None:
+            values = param["choices"]
+        elif sweep_choices and param["nargs"] is None and param["type"] == "bool":
+            values = (False, True)
+        elif param["mandatory"]:
+            raise RuntimeError(f"Mandatory parameter {name} needs a sweep range")
+        else:
+            fixed[name] = param["value"]
+            continue
+
+        seen = set()
+        axes[name] = []
+        for val in values:
+            val = _convert_param_value(param, val)
+            key = hashlib.sha1(
+                json.dumps(val, sort_keys=True, default=str).encode()
+            ).digest()
+            if key not in seen:
+                seen.add(key)
+                axes[name].append(val)
+
+    combinations = itertools.product(*axes.values())
+    for combination in itertools.islice(combinations, shard, None, num_shards):
+        values = dict(fixed)
+        values.update(zip(axes.keys(), combination))
+        yield {name: values[name] for name in names}
+
+
+def iter_sweep_ndjson(params, ranges, **kwargs):
+    """Lazily generate the parameter sets of a grid sweep as NDJSON lines
+
+    Takes the same arguments as `iter_sweep`. Each yielded string is a JSON object
+    terminated by a newline, so the output can be passed directly to `writelines`.
+    """
+    import json
+
+    for combination in iter_sweep(params, ranges, **kwargs):
+        yield json.dumps(combination, default=str) + "\n"
+
+
+class ResultCache:
+    """On-disk cache of function results with least-recently-used eviction
+
+    Parameters
+    ----------
+    directory : str
+        Directory in which to store the results. Defaults to ~/.cache/func2argparse
+    max_entries : int
+        Maximum number of stored results
+    max_bytes : int
+        Maximum total size in bytes of the stored results. None for no limit
+    """
+
+    def __init__(self, directory=None, max_entries=1000, max_bytes=None):
+        import os
+
+        if directory is None:
+            directory = os.path.join(os.path.expanduser("~"), ".cache", "func2argparse")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        import os
+
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _entries(self):
+        import os
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted concurrently
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+        return entries
+
+    def get(self, key):
+        """Return a tuple (found, value) for the given key"""
+        import os
+        import pickle
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return False, None
+        except Exception:
+            # Corrupted entries or entries referring to classes which no longer exist
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.misses += 1
+            return False, None
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return True, value
+
+    def put(self, key, value):
+        import os
+        import pickle
+        import tempfile
+
+        fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpname, self._path(key))
+        except BaseException:
+            os.remove(tmpname)
+            raise
+        self._evict()
+
+    def _evict(self):
+        import os
+
+        entries = sorted(self._entries())
+        total = sum(entry[1] for entry in entries)
+        while entries and (
+            len(entries) > self.max_entries
+            or (self.max_bytes is not None and total > self.max_bytes)
+        ):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        import os
+
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(entry[1] for entry in entries),
+        }
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the ResultCache shared by all `call_cached` calls without a cache"""
+    global _default_cache
+
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def _hash_code(hasher, code):
+    import inspect
+
+    hasher.update(code.co_code)
+    hasher.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            # The repr of code objects contains memory addresses
+            _hash_code(hasher, const)
+        else:
+            hasher.update(_canonical_const(const).encode())
+
+
+def _canonical_const(const):
+    # The repr of frozensets (e.g. from `x in {"a", "b"}`) depends on PYTHONHASHSEED
+    if isinstance(const, frozenset):
+        members = sorted(_canonical_const(cc) for cc in const)
+        return "frozenset({" + ", ".join(members) + "})"
+    if isinstance(const, tuple):
+        return "(" + ", ".join(_canonical_const(cc) for cc in const) + ",)"
+    return repr(const)
+
+
+def _function_fingerprint(func):
+    import hashlib
+
+    hasher = hashlib.sha256(f"{func.__module__}.{func.__qualname__}".encode())
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        _hash_code(hasher, code)
+    return hasher.hexdigest()
+
+
+def _normalize_cache_value(param, value):
+    import json
+
+    def normalize(val):
+        if param["type"] == "Path" and isinstance(val, (str, Path)):
+            path = Path(val).absolute()
+            try:
+                st = path.stat()
+            except OSError:
+                return str(path)
+            # Existing files are also keyed on their state so that changes miss
+            return [str(path), st.st_mtime_ns, st.st_size]
+        if param["type"] == "float" and type(val) is int:
+            return float(val)
+        if isinstance(val, Path):
+            return str(val)
+        if isinstance(val, tuple):
+            return [normalize(vv) for vv in val]
+        return val
+
+    if isinstance(value, ArrayParam):
+        return value.digest()
+    if "struct" in param and value is not None:
+        cls = _resolve_struct(param["struct"])
+        if cls is not None:
+            value = _struct_to_dict(cls, value)
+        return json.loads(json.dumps(value, default=str))
+    if param["nargs"] is not None and isinstance(value, (list, tuple)):
+        return [normalize(val) for val in value]
+    return normalize(value)
+
+
+def call_cached(func, args, params=None, cache=None):
+    """Call a function with parsed arguments, reusing previously stored results
+
+    Only use it for functions whose result depends exclusively on their arguments.
+    The cache key is computed from the function code and the arguments normalized
+    according to the manifest parameter types (e.g. paths are made absolute and
+    dictionaries are compared independently of their key order). Paths to existing
+    files also include their modification time and size, so modifying an input
+    file invalidates the results computed from it.
+
+    Parameters
+    ----------
+    func : function
+        The function to call
+    args : argparse.Namespace or dict
+        The arguments as returned by the argparser. Arguments which are not
+        function parameters (like conf) are not passed to the function
+    params : list
+        The manifest parameters of the function. Computed from the function if None
+    cache : ResultCache
+        The cache in which to store the results. Uses the shared cache returned by
+        `get_default_cache` if None
+
+    Returns
+    -------
+    result :
+        The result of the function
+    """
+    import hashlib
+    import json
+    import warnings
+    import pickle
+
+    if isinstance(args, argparse.Namespace):
+        args = vars(args)
+    if params is None:
+        params = _parse_function(func)[2]
+    if cache is None:
+        cache = get_default_cache()
+
+    kwargs = {prm["name"]: args[prm["name"]] for prm in params if prm["name"] in args}
+    # Omitted arguments take their default so that equivalent calls share the key
+    normalized = {}
+    for prm in params:
+        if prm["name"] in kwargs:
+            normalized[prm["name"]] = _normalize_cache_value(prm, kwargs[prm["name"]])
+        elif not prm["mandatory"]:
+            normalized[prm["name"]] = _normalize_cache_value(prm, prm["value"])
+    key = hashlib.sha256(
+        json.dumps(
+            [_function_fingerprint(func), normalized], sort_keys=True, default=str
+        ).encode()
+    ).hexdigest()
+
+    found, result = cache.get(key)
+    if found:
+        return result
+
+    result = func(**kwargs)
+    try:
+        cache.put(key, result)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        warnings.warn(f"Could not store the result of {func.__name__} in cache: {e}")
+    return result
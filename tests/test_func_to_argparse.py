@@ -1,5 +1,6 @@
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Union
+from typing import NamedTuple, Optional, TypedDict, Union
 
 
 def _dict2list(dd):
@@ -370,3 +371,709 @@ def _test_implicit_nullable():
     assert params["d"]["nullable"] is True
     assert params["e"]["nullable"] is False
     assert params["f"]["nullable"] is False
+
+
+def _test_conf_layers(tmp_path):
+    from func2argparse import (
+        func_to_manifest,
+        manifest_to_argparser,
+        load_config_layers,
+        _merge_config_layers,
+    )
+
+    site = tmp_path / "site.yaml"
+    site.write_text('x: 1\ny: site.txt\nz: 10\nd: {"a": 1, "b": {"c": 2}}\n')
+    project = tmp_path / "project.yaml"
+    project.write_text('z: 20\nd: {"b": {"e": 3}}\n')
+
+    config = load_config_layers([site, project])
+    assert config == {
+        "x": 1,
+        "y": "site.txt",
+        "z": 20,
+        "d": {"a": 1, "b": {"c": 2, "e": 3}},
+    }
+
+    # The merged result is cached and protected from modifications
+    config["d"]["a"] = 5
+    hits = _merge_config_layers.cache_info().hits
+    assert load_config_layers([site, project])["d"]["a"] == 1
+    assert _merge_config_layers.cache_info().hits == hits + 1
+    assert load_config_layers([site, project], parallel=True)["z"] == 20
+
+    def _func_conf(x: int = 0, y: Path = None, z: int = 54, d: dict = None):
+        """Test layered configs
+
+        Parameters
+        ----------
+        x : int
+            First arg
+        y : Path
+            Second arg
+        z : int
+            Third arg
+        d : dict
+            Fourth arg
+        """
+        pass
+
+    manifest = func_to_manifest(_func_conf)
+    parser = manifest_to_argparser(manifest, exit_on_error=False, allow_conf_yaml=True)
+
+    args = parser.parse_args(["--conf", str(site), str(project)])
+    assert args.z == 20
+    assert args.d == {"a": 1, "b": {"c": 2, "e": 3}}
+    assert args.conf == [str(site), str(project)]
+
+    # Repeated --conf options are layered as well
+    args = parser.parse_args(["--conf", str(site), "--conf", str(project)])
+    assert args.z == 20
+    assert args.d == {"a": 1, "b": {"c": 2, "e": 3}}
+
+    # Explicit arguments take precedence independently of their position
+    args = parser.parse_args(["--z", "3", "--conf", str(site), str(project)])
+    assert args.z == 3
+    assert args.x == 1
+    args = parser.parse_args(["--conf", str(site), "--z", "3", "--conf", str(project)])
+    assert args.z == 3
+
+    # Explicit values equal to the default or to an earlier layer also take precedence
+    conf = tmp_path / "conf.yaml"
+    conf.write_text("z: 10\n")
+    args = parser.parse_args(["--z", "54", "--conf", str(conf)])
+    assert args.z == 54
+    args = parser.parse_args(["--conf", str(site), "--z", "10", "--conf", str(project)])
+    assert args.z == 10
+    args = parser.parse_args(["--conf", str(conf), "--conf", str(project)])
+    assert args.z == 20
+
+
+def _test_sweep():
+    from func2argparse import func_to_manifest, iter_sweep, iter_sweep_ndjson
+    import itertools
+    import json
+
+    manifest = func_to_manifest(_func)
+    params = manifest["params"]
+
+    ranges = {
+        "x": ["1", 1, 2, 3],  # "1" is converted and deduplicated
+        "y": ["a.txt"],
+        "ll": [[1, 2], ("3", "4")],
+    }
+    sweep = iter_sweep(params, ranges, sweep_choices=True)
+    first = next(sweep)
+    assert first == {
+        "x": 1,
+        "y": Path("a.txt"),
+        "z": 54,
+        "w": ("hey", "ho"),
+        "k": "choice1",
+        "ll": [1, 2],
+        "flg": False,
+        "lb": True,
+    }
+    combinations = [first] + list(sweep)
+    # 3 x values * 2 ll values * 2 k choices * 2 flg values
+    assert len(combinations) == 24
+    assert len({json.dumps(c, default=str) for c in combinations}) == 24
+
+    # Shards are disjoint and cover the whole sweep
+    shards = [list(iter_sweep(params, ranges, True, i, 5)) for i in range(5)]
+    assert sorted(map(str, itertools.chain(*shards))) == sorted(map(str, combinations))
+
+    lines = list(iter_sweep_ndjson(params, {"x": range(2), "y": ["a.txt"]}))
+    assert [json.loads(line)["x"] for line in lines] == [0, 1]
+    assert json.loads(lines[0])["y"] == "a.txt"
+
+    # The sweep is never materialized
+    huge = iter_sweep(params, {"x": range(10**4), "y": ["a.txt"], "z": range(10**4)})
+    assert next(huge)["z"] == 0
+
+    for ranges in (
+        {"x": [1], "y": "abc"},  # Strings are not iterated character by character
+        {"x": [1], "y": ["a.txt"], "z": {1: 2}},
+        {"x": [1], "y": ["a.txt"], "k": b"choice1"},
+        {"x": ["a"], "y": ["a.txt"]},
+        {"x": [1], "y": ["a.txt"], "k": ["choice3"]},
+        {"x": [1], "y": ["a.txt"], "ll": [1]},
+    ):
+        try:
+            next(iter_sweep(params, ranges))
+        except ValueError:
+            pass
+        else:
+            raise RuntimeError("Did not raise value error")
+
+    try:
+        next(iter_sweep(params, {"x": [1]}))
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("Did not raise on missing mandatory parameter")
+
+
+_cached_calls = []
+
+
+def _func_cached(inp: Path, n: int = 1, opts: dict = None):
+    """Test memoization
+
+    Parameters
+    ----------
+    inp : Path
+        Input file
+    n : int
+        Repetitions
+    opts : dict
+        Options
+    """
+    _cached_calls.append(n)
+    return [str(inp)] * n
+
+
+def _func_set_literal(x):
+    return x in {"alpha", "beta", "gamma", "delta", "epsilon"}, ("a", frozenset())
+
+
+def _test_function_fingerprint_hashseed():
+    import os
+    import subprocess
+    import sys
+
+    testdir = os.path.dirname(os.path.abspath(__file__))
+    code = (
+        "import sys; sys.path[:0] = [{!r}, {!r}]; "
+        "from func2argparse import _function_fingerprint; "
+        "from test_func_to_argparse import _func_set_literal; "
+        "print(_function_fingerprint(_func_set_literal))"
+    ).format(testdir, os.path.dirname(testdir))
+
+    digests = set()
+    for seed in range(1, 5):
+        env = dict(os.environ, PYTHONHASHSEED=str(seed))
+        out = subprocess.run(
+            [sys.executable, "-c", code], env=env, capture_output=True, check=True
+        )
+        digests.add(out.stdout.strip())
+    assert len(digests) == 1
+
+
+def _test_call_cached(tmp_path, monkeypatch):
+    from func2argparse import (
+        func_to_manifest,
+        manifest_to_argparser,
+        call_cached,
+        get_default_cache,
+        ResultCache,
+    )
+    import func2argparse
+
+    monkeypatch.chdir(tmp_path)
+    manifest = func_to_manifest(_func_cached)
+    parser = manifest_to_argparser(manifest, exit_on_error=False)
+    cache = ResultCache(tmp_path / "cache", max_entries=2)
+
+    args = parser.parse_args(["--inp", "a.txt", "--opts", '{"a": 1, "b": 2}'])
+    assert call_cached(_func_cached, args, manifest["params"], cache) == ["a.txt"]
+    assert _cached_calls == [1]
+
+    # Equivalent arguments hit the cache and skip execution
+    args = parser.parse_args(
+        ["--inp", str(tmp_path / "a.txt"), "--opts", '{"b": 2, "a": 1}']
+    )
+    assert call_cached(_func_cached, args, manifest["params"], cache) == ["a.txt"]
+    assert _cached_calls == [1]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    call_cached(_func_cached, {"inp": "a.txt", "n": 2}, cache=cache)
+    call_cached(_func_cached, {"inp": "a.txt", "n": 3}, cache=cache)
+    assert _cached_calls == [1, 2, 3]
+    assert cache.stats()["entries"] == 2
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+    # Omitted arguments are keyed with their default value
+    call_cached(_func_cached, {"inp": "b.txt"}, cache=cache)
+    call_cached(_func_cached, {"inp": "b.txt", "n": 1}, cache=cache)
+    assert _cached_calls == [1, 2, 3, 1]
+
+    # Corrupted entries and entries of classes which no longer exist are misses
+    for i, content in enumerate((b"garbage", b"cnonexistent_module_f2a\nKlass\n.")):
+        for entry in (tmp_path / "cache").glob("*.pkl"):
+            entry.write_bytes(content)
+        call_cached(_func_cached, {"inp": "b.txt"}, cache=cache)
+        assert _cached_calls == [1, 2, 3, 1] + [1] * (i + 1)
+    call_cached(_func_cached, {"inp": "b.txt"}, cache=cache)
+    assert _cached_calls == [1, 2, 3, 1, 1, 1]
+
+    # Modified input files miss the cache
+    (tmp_path / "d.txt").write_text("a")
+    call_cached(_func_cached, {"inp": "d.txt"}, cache=cache)
+    call_cached(_func_cached, {"inp": "d.txt"}, cache=cache)
+    assert _cached_calls == [1, 2, 3, 1, 1, 1, 1]
+    (tmp_path / "d.txt").write_text("ab")
+    call_cached(_func_cached, {"inp": "d.txt"}, cache=cache)
+    assert _cached_calls == [1, 2, 3, 1, 1, 1, 1, 1]
+
+    # Calls without a cache share the default one
+    monkeypatch.setattr(func2argparse, "_default_cache", ResultCache(tmp_path / "d"))
+    call_cached(_func_cached, {"inp": "c.txt"})
+    call_cached(_func_cached, {"inp": "c.txt"})
+    assert get_default_cache().stats()["hits"] == 1
+    assert get_default_cache().stats()["misses"] == 1
+
+
+def _func_bad_docs(a: int, b: int, c: int = 1):
+    """Badly documented function
+
+    Parameters
+    ----------
+    a : int
+        First arg
+    d : int
+        Not in the signature
+    """
+    pass
+
+
+def _func_bad_order(a: int, b: int):
+    """Function with wrong argument order
+
+    Parameters
+    ----------
+    b : int
+        Second arg
+    a : int
+        First arg
+    """
+    pass
+
+
+def _func_bad_default(a: list[int] = ()):
+    """Function with empty default
+
+    Parameters
+    ----------
+    a : list[int]
+        First arg
+    """
+    pass
+
+
+def _test_validate_functions():
+    from func2argparse import validate_functions
+
+    def _func_str_annotation(a: "int"):
+        """Function with a string annotation
+
+        Parameters
+        ----------
+        a : int
+            First arg
+        """
+        pass
+
+    errors = validate_functions(
+        [
+            _func,
+            _func_bad_docs,
+            _func_bad_order,
+            _func_bad_default,
+            lambda x: x,
+            _func_str_annotation,
+            getattr,  # No signature
+            _func_union,
+        ]
+    )
+    assert len(errors) == 6
+    assert [len(e) for e in errors.values()] == [3, 1, 1, 1, 1, 1]
+    assert errors["builtins.getattr"][0].startswith("ValueError")
+    assert "Argument order mismatch" in errors[f"{__name__}._func_bad_order"][0]
+    assert "empty tuples/lists" in errors[f"{__name__}._func_bad_default"][0]
+
+
+def _test_diff_manifests():
+    from func2argparse import func_to_manifest, diff_manifests
+    import copy
+    import json
+
+    old = {"functions": []}
+    for func in (_func, _func_union):
+        entry = func_to_manifest(func)
+        old["functions"].append(
+            {
+                "function": f"mod.{func.__name__}",
+                "name": func.__name__,
+                "description": entry["description"],
+                "params": entry["params"],
+            }
+        )
+    old["functions"].append({"function": "mod._gone", "name": "_gone", "params": []})
+    # Round trip through JSON like a committed manifest
+    old = json.loads(json.dumps(old))
+
+    new = copy.deepcopy(old)
+    del new["functions"][2]
+    new["functions"].append({"function": "mod._new", "name": "_new", "params": []})
+    params = new["functions"][0]["params"]
+    params[:] = [prm for prm in params if prm["name"] != "lb"]
+    params[0]["type"] = "float"
+    params[4]["choices"] = ["choice1"]
+    params[2]["mandatory"] = True
+
+    diff = diff_manifests(old, new)
+    assert diff["added"] == ["_new"]
+    assert diff["removed"] == ["_gone"]
+    assert diff["changed"] == ["_func"]
+    assert diff["breaking"] == [
+        "_func: Changed type of parameter x from int to float",
+        "_func: Parameter z became mandatory",
+        "_func: Removed choices ['choice2'] of parameter k",
+        "_func: Removed parameter lb",
+        "_gone: Removed function",
+    ]
+
+    diff = diff_manifests(old, old)
+    assert diff == {"added": [], "removed": [], "changed": [], "breaking": []}
+
+
+def _write_npy(path, descr, values):
+    import struct
+
+    fmt = {"<f8": "d", "<i4": "i"}[descr]
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(values)},), }}"
+    header = header.ljust(117) + "\n"
+    with open(path, "wb") as f:
+        f.write(b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)))
+        f.write(header.encode("latin1"))
+        f.write(struct.pack(f"<{len(values)}{fmt}", *values))
+
+
+def _test_array_params(tmp_path):
+    from func2argparse import func_to_manifest, manifest_to_argparser, ArrayParam
+    import argparse
+    import array
+    import copy
+    import pickle
+
+    def _func_arrays(vals: list[float] = None, idx: list[int] = None):
+        """Test array parameters
+
+        Parameters
+        ----------
+        vals : list[float]
+            Values
+        idx : list[int]
+            Indexes
+        """
+        pass
+
+    _write_npy(tmp_path / "vals.npy", "<f8", [0.5, 1.5, 2.5])
+    _write_npy(tmp_path / "idx.npy", "<i4", [3, 2, 1, 0])
+    with open(tmp_path / "idx.bin", "wb") as f:
+        array.array("q", range(1000)).tofile(f)
+
+    manifest = func_to_manifest(_func_arrays)
+    parser = manifest_to_argparser(manifest, exit_on_error=False, allow_conf_yaml=True)
+
+    args = parser.parse_args(
+        ["--vals", f"@{tmp_path / 'vals.npy'}", "--idx", f"@{tmp_path / 'idx.bin'}"]
+    )
+    assert isinstance(args.vals, ArrayParam)
+    assert args.vals == [0.5, 1.5, 2.5]
+    assert len(args.idx) == 1000 and args.idx[999] == 999
+    assert args.idx[10:13] == [10, 11, 12]
+
+    # Plain values still work
+    args = parser.parse_args(["--vals", "1", "2"])
+    assert args.vals == [1.0, 2.0]
+
+    conf = tmp_path / "conf.yaml"
+    conf.write_text(f"idx: '@{tmp_path / 'idx.npy'}'\n")
+    args = parser.parse_args(["--conf", str(conf)])
+    assert args.idx.tolist() == [3, 2, 1, 0]
+
+    # Relative references in config files are relative to the config file
+    (tmp_path / "sub").mkdir()
+    conf = tmp_path / "sub" / "conf.yaml"
+    conf.write_text("idx: '@../idx.npy'\n")
+    with parser.parse_args(["--conf", str(conf)]).idx as idx:
+        assert idx.tolist() == [3, 2, 1, 0]
+        digest = idx.digest()
+    try:
+        idx[0]
+    except ValueError:
+        pass
+    else:
+        raise RuntimeError("Could access a closed array")
+    idx = ArrayParam(tmp_path / "idx.npy", int)
+    assert idx.digest() == digest
+    idx.close()
+
+    # Namespaces with arrays can be pickled and copied, e.g. for process pools
+    args = parser.parse_args(["--vals", f"@{tmp_path / 'vals.npy'}"])
+    for copied in (pickle.loads(pickle.dumps(args)), copy.deepcopy(args)):
+        assert isinstance(copied.vals, ArrayParam)
+        assert copied.vals == [0.5, 1.5, 2.5]
+        copied.vals.close()
+
+    for argv in (
+        ["--vals", f"@{tmp_path / 'idx.npy'}"],  # Wrong data type
+        ["--vals", f"@{tmp_path / 'missing.npy'}"],
+        ["--vals", "1", f"@{tmp_path / 'vals.npy'}"],
+    ):
+        try:
+            parser.parse_args(argv)
+        except argparse.ArgumentError:
+            pass
+        else:
+            raise RuntimeError("Did not raise argument error")
+
+
+def _test_parser_pool_threads(tmp_path):
+    from func2argparse import func_to_manifest, ParserPool
+    from concurrent.futures import ThreadPoolExecutor
+    import asyncio
+
+    conf = tmp_path / "conf.yaml"
+    conf.write_text("z: 7\n")
+    pool = ParserPool(func_to_manifest(_func), exit_on_error=False, allow_conf_yaml=True)
+
+    def parse(i):
+        argv = ["--x", str(i), "--y", f"{i}.txt", "--ll", str(i), str(i + 1)]
+        if i % 2:
+            argv += ["--conf", str(conf)]
+        args = pool.parse_args(argv)
+        assert args.x == i
+        assert args.y == Path(f"{i}.txt")
+        assert args.ll == [i, i + 1]
+        assert args.z == (7 if i % 2 else 54)
+        return i
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        assert list(executor.map(parse, range(2000))) == list(range(2000))
+
+    async def parse_all():
+        async def task(i):
+            await asyncio.sleep(0)
+            return parse(i)
+
+        return await asyncio.gather(*[task(i) for i in range(200)])
+
+    assert asyncio.run(parse_all()) == list(range(200))
+
+
+@dataclass
+class _Schedule:
+    gamma: float = 0.1
+    steps: list[int] = field(default_factory=lambda: [10, 20])
+
+
+@dataclass
+class _Optimizer:
+    lr: float
+    name: str = "adam"
+    nesterov: bool = False
+    schedule: _Schedule = field(default_factory=_Schedule)
+
+
+class _Point(NamedTuple):
+    x: int
+    y: int = 0
+
+
+class _Limits(TypedDict, total=False):
+    lower: float
+    upper: float
+
+
+def _func_struct(
+    opt: _Optimizer,
+    start: _Point = _Point(1, 2),
+    limits: Optional[_Limits] = None,
+):
+    """Test structured parameters
+
+    Parameters
+    ----------
+    opt : _Optimizer
+        Optimizer settings
+    start : _Point
+        Starting point
+    limits : _Limits
+        Limits
+    """
+    pass
+
+
+def _func_struct2(opt: _Optimizer = None):
+    """Test sharing of structured parameters
+
+    Parameters
+    ----------
+    opt : _Optimizer
+        Optimizer settings
+    """
+    pass
+
+
+def _test_struct_params(tmp_path):
+    from func2argparse import func_to_manifest, manifest_to_argparser, _struct_fields
+    import argparse
+    import json
+
+    manifest = func_to_manifest(_func_struct)
+    params = {p["name"]: p for p in manifest["params"]}
+    assert params["opt"]["type"] == "_Optimizer"
+    fields = {f["name"]: f for f in params["opt"]["fields"]}
+    assert fields["opt.lr"]["tag"] == "--opt.lr"
+    assert fields["opt.lr"]["mandatory"] is True
+    assert fields["opt.name"]["mandatory"] is False
+    assert fields["opt.schedule"]["fields"][1]["name"] == "opt.schedule.steps"
+    assert fields["opt.schedule"]["fields"][1]["nargs"] == "+"
+    assert params["start"]["value"] == {"x": 1, "y": 2}
+    json.dumps(manifest)
+
+    # The field schema is computed once per class
+    hits = _struct_fields.cache_info().hits
+    manifest2 = func_to_manifest(_func_struct2)
+    assert _struct_fields.cache_info().hits > hits
+    assert manifest2["params"][0]["fields"][0]["mandatory"] is False
+
+    parser = manifest_to_argparser(manifest, exit_on_error=False, allow_conf_yaml=True)
+    args = parser.parse_args(
+        ["--opt.lr", "0.5", "--opt.schedule.steps", "1", "2", "3", "--opt.nesterov"]
+    )
+    assert args.opt == _Optimizer(0.5, "adam", True, _Schedule(0.1, [1, 2, 3]))
+    assert args.start == _Point(1, 2)
+    assert args.limits is None
+    assert "opt.lr" not in vars(args)
+
+    args = parser.parse_args(["--opt.lr", "1", "--start.y", "5", "--limits.upper", "3"])
+    assert args.opt == _Optimizer(1.0)
+    assert args.start == _Point(1, 5)
+    assert args.limits == {"upper": 3.0}
+
+    # Config files are built into the class too, explicit fields take precedence
+    conf = tmp_path / "conf.yaml"
+    conf.write_text("opt:\n  lr: 0.1\n  schedule:\n    gamma: 0.5\n")
+    args = parser.parse_args(["--conf", str(conf), "--opt.schedule.steps", "4"])
+    assert args.opt == _Optimizer(0.1, schedule=_Schedule(0.5, [4]))
+
+    for argv in (
+        [],  # Missing mandatory field
+        ["--opt.lr", "fast"],
+    ):
+        try:
+            parser.parse_args(argv)
+        except argparse.ArgumentError:
+            pass
+        else:
+            raise RuntimeError("Did not raise argument error")
+
+    # Partial config values are merged over the parameter default
+    conf.write_text("opt:\n  lr: 0.1\nstart:\n  y: 5\n")
+    args = parser.parse_args(["--conf", str(conf)])
+    assert args.start == _Point(1, 5)
+
+    # Fields can also be set with their dotted names
+    conf.write_text("opt.lr: 0.1\nopt.schedule.gamma: 0.3\nstart.x: 4\n")
+    args = parser.parse_args(["--conf", str(conf), "--opt.lr", "2"])
+    assert args.opt == _Optimizer(2.0, schedule=_Schedule(0.3))
+    assert args.start == _Point(4, 2)
+
+    # Config values are converted and checked like command line values
+    conf.write_text("opt.lr: '0.5'\nopt.schedule.steps: ['1', 2]\n")
+    args = parser.parse_args(["--conf", str(conf)])
+    assert args.opt == _Optimizer(0.5, schedule=_Schedule(steps=[1, 2]))
+
+    for content in (
+        "opt:\n  lr: 0.1\n  momentum: 0.5\n",  # Unknown field
+        "opt:\n  lr: abc\n",
+        "opt.lr: 0.1\nopt.schedule.steps: 5\n",
+        "opt.lr: [1, 2]\n",
+        "opt.lr: 0.1\nstart.x: 1.5\n",
+    ):
+        conf.write_text(content)
+        try:
+            parser.parse_args(["--conf", str(conf)])
+        except argparse.ArgumentError:
+            pass
+        else:
+            raise RuntimeError(f"Did not raise argument error for {content!r}")
+
+
+def _test_backends(tmp_path, monkeypatch):
+    from func2argparse import (
+        set_backends,
+        get_backends,
+        str_to_dict,
+        load_config_layers,
+        _merge_config_layers,
+    )
+    import argparse
+    import importlib.util
+    import math
+    import sys
+
+    conf = tmp_path / "conf.yaml"
+    conf.write_text("a: 1\nb: {c: [1, 2]}\n")
+    confjson = tmp_path / "conf.json"
+    confjson.write_text('{"a": 1, "b": {"c": [1, 2]}}')
+
+    installed = [
+        name for name in ("json", "orjson", "ujson") if importlib.util.find_spec(name)
+    ]
+    try:
+        # Fast parsers are opt-in since they don't give the same results
+        set_backends()
+        assert get_backends()["json"] == "json"
+        assert str_to_dict('{"a": 123456789012345678901234567890}') == {
+            "a": 123456789012345678901234567890
+        }
+        assert math.isnan(str_to_dict('{"a": NaN}')["a"])
+
+        for json_backend in installed:
+            for yaml_backend in ("python", "libyaml"):
+                try:
+                    set_backends(json=json_backend, yaml=yaml_backend)
+                except RuntimeError:
+                    assert yaml_backend == "libyaml"  # PyYAML without libyaml
+                    continue
+                assert get_backends() == {"json": json_backend, "yaml": yaml_backend}
+                assert str_to_dict('{"a": [1, 2.5]}') == {"a": [1, 2.5]}
+                try:
+                    str_to_dict('{"a": ')
+                except argparse.ArgumentTypeError:
+                    pass
+                else:
+                    raise RuntimeError("Did not raise argument type error")
+                _merge_config_layers.cache_clear()
+                assert load_config_layers([conf]) == {"a": 1, "b": {"c": [1, 2]}}
+                assert load_config_layers([confjson]) == {"a": 1, "b": {"c": [1, 2]}}
+
+        # PyYAML is optional
+        with monkeypatch.context() as mp:
+            mp.setitem(sys.modules, "yaml", None)
+            set_backends()
+            assert get_backends() == {"json": "json", "yaml": None}
+            assert str_to_dict('{"a": 1}') == {"a": 1}
+            for yaml_backend in ("python", "libyaml"):
+                try:
+                    set_backends(yaml=yaml_backend)
+                except RuntimeError:
+                    pass
+                else:
+                    raise RuntimeError("Did not raise on missing PyYAML")
+
+        for kwargs in ({"json": "simplejson5"}, {"yaml": "rust"}):
+            try:
+                set_backends(**kwargs)
+            except RuntimeError:
+                pass
+            else:
+                raise RuntimeError("Did not raise on unknown backend")
+    finally:
+        set_backends()